@@ -1,35 +1,42 @@
 # /backend/app.py
 from datetime import datetime, timezone
+import asyncio
+import functools
 import os
 import json
 import subprocess
+import sys
 import time
-from typing import Optional, Dict, Any
+from typing import Literal, Optional, Dict, Any
 import logging
 import logging.config
+import logging.handlers
+import queue
 import yaml
 
 from fastapi import FastAPI, Depends, Query, Request, HTTPException
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from starlette.middleware.gzip import GZipMiddleware
+from pydantic import BaseModel, field_validator
 from dotenv import dotenv_values
 
-from uuid import uuid4
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, select
+from sqlalchemy.exc import IntegrityError
 
 import hashlib
 import hmac
 import secrets
 
-from db import init_db, get_db, DATABASE_URL
+from db import init_db, get_db, DATABASE_URL, SessionLocal
 from models import Message, User
 from routes.mem0_routes import router as mem0_router
 from utils import (
     auth,
+    embed_cache_stats,
     load_model,
     now_iso,
-    iso_datetime,
     parse_ts,
     DEBUG_LOG,
     MEM_MODEL_NAME,
@@ -42,6 +49,8 @@ with open("log_config.yaml", "r") as f:
     logging.config.dictConfig(log_config)
 
 conversation_logger = logging.getLogger("conversation")
+save_logger = logging.getLogger("alfred.save")
+save_logger.setLevel(logging.DEBUG if DEBUG_LOG else logging.INFO)
 
 # -------------------- Environment --------------------
 PORT = int(os.getenv("PORT", "3000"))
@@ -64,21 +73,32 @@ if os.path.exists(".tailscale"):
 
 
 # Password hash configuration (for user registration/login)
+# scrypt parameters: memory-hard KDF, dispatched to OpenSSL by hashlib.
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+SCRYPT_DKLEN = 32
 
 
 def hash_password(password: str) -> str:
     """
-    Hash password with a random salt using SHA-256.
-    Format: "salt$hash"
+    Hash password with a random salt using scrypt.
+    Format: "salt$hash" (both hex).
     """
     if not isinstance(password, str):
         raise ValueError("password must be a string")
 
     # Generate a 16-byte random salt
-    salt = secrets.token_hex(16)
-    pw_bytes = (salt + password).encode("utf-8")
-    digest = hashlib.sha256(pw_bytes).hexdigest()
-    return f"{salt}${digest}"
+    salt = os.urandom(16)
+    dk = hashlib.scrypt(
+        password.encode("utf-8"),
+        salt=salt,
+        n=SCRYPT_N,
+        r=SCRYPT_R,
+        p=SCRYPT_P,
+        dklen=SCRYPT_DKLEN,
+    )
+    return f"{salt.hex()}${dk.hex()}"
 
 
 def verify_password(plain_password: str, stored_hash: str) -> bool:
@@ -86,20 +106,80 @@ def verify_password(plain_password: str, stored_hash: str) -> bool:
     Verify password against stored "salt$hash".
     """
     try:
-        salt, digest = stored_hash.split("$", 1)
+        salt_hex, dk_hex = stored_hash.split("$", 1)
+        salt = bytes.fromhex(salt_hex)
+        dk = bytes.fromhex(dk_hex)
     except ValueError:
         # Incorrect format will result in immediate failure.
         return False
 
-    pw_bytes = (salt + plain_password).encode("utf-8")
-    check = hashlib.sha256(pw_bytes).hexdigest()
+    check = hashlib.scrypt(
+        plain_password.encode("utf-8"),
+        salt=salt,
+        n=SCRYPT_N,
+        r=SCRYPT_R,
+        p=SCRYPT_P,
+        dklen=SCRYPT_DKLEN,
+    )
+
+    # Use hmac.compare_digest to prevent timing attacks (raw bytes, not hex)
+    return hmac.compare_digest(check, dk)
 
-    # Use hmac.compare_digest to prevent timing attacks
+
+def verify_password_legacy(plain_password: str, stored_hash: str) -> bool:
+    """
+    Verify against the pre-scrypt format: sha256(salt + password) stored
+    as "salt$hexdigest". Same "32-hex$64-hex" shape as the scrypt format,
+    so rows can only be told apart by actually checking both.
+    """
+    try:
+        salt, digest = stored_hash.split("$", 1)
+    except ValueError:
+        return False
+
+    check = hashlib.sha256((salt + plain_password).encode("utf-8")).hexdigest()
     return hmac.compare_digest(check, digest)
 
 
 # -------------------- FastAPI --------------------
-app = FastAPI(title="Alfred Backend (Mem0-local)")
+app = FastAPI(title="Alfred Backend (Mem0-local)", default_response_class=ORJSONResponse)
+
+_SAVE_DISABLED_BODY = b'{"ok":true,"skipped":"chat-saving disabled"}'
+
+
+class ChatSaveDisabledMiddleware:
+    """
+    Answer POST /save directly when DISABLE_CHAT_SAVE=1, skipping routing
+    and Pydantic body validation entirely. Registered before (inside) CORS
+    so the short-circuited response still gets CORS headers.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send, _disabled=DISABLE_CHAT_SAVE):
+        if (
+            _disabled
+            and scope["type"] == "http"
+            and scope["path"] == "/save"
+            and scope["method"] == "POST"
+        ):
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 200,
+                    "headers": [
+                        (b"content-type", b"application/json"),
+                        (b"content-length", str(len(_SAVE_DISABLED_BODY)).encode()),
+                    ],
+                }
+            )
+            await send({"type": "http.response.body", "body": _SAVE_DISABLED_BODY})
+            return
+        await self.app(scope, receive, send)
+
+
+app.add_middleware(ChatSaveDisabledMiddleware)
 
 origins = [
     "http://localhost:5173",
@@ -109,12 +189,18 @@ origins = [
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # tighten in production
+    # Explicit list: lets the middleware do a set-membership check instead of
+    # echoing the request origin through the wildcard+credentials path.
+    allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+# Compress large responses (e.g. /history) but leave tiny ones alone,
+# where the gzip overhead would outweigh the bandwidth win.
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Register mem0 router
 app.include_router(mem0_router)
 
@@ -122,22 +208,38 @@ app.include_router(mem0_router)
 # -------------------- Request models --------------------
 class SaveReq(BaseModel):
     userId: str
-    role: str
+    role: Literal["user", "assistant", "system"]
     text: str
     ts: Optional[str] = None
     chatId: Optional[str] = None
     meta: Optional[Dict[str, Any]] = None
 
+    @field_validator("role", mode="before")
+    @classmethod
+    def _lower_role(cls, v):
+        # Accept "User"/"ASSISTANT" etc.; pydantic-core enforces the Literal.
+        return v.lower() if isinstance(v, str) else v
+
 
 class RegisterReq(BaseModel):
     username: str
     password: str
 
+    @field_validator("username", mode="before")
+    @classmethod
+    def _norm_username(cls, v):
+        return (v or "").strip().lower()
+
 
 class LoginReq(BaseModel):
     username: str
     password: str
 
+    @field_validator("username", mode="before")
+    @classmethod
+    def _norm_username(cls, v):
+        return (v or "").strip().lower()
+
 
 class AuthResp(BaseModel):
     userId: str
@@ -152,7 +254,72 @@ class ConversationEndReq(BaseModel):
 
 
 # -------------------- Tailscale helpers --------------------
-def _start_tailscale_service_windows() -> None:
+# Funnel config survives restarts inside tailscaled, so a fresh cache file
+# lets warm starts (e.g. uvicorn reload) skip every tailscale CLI spawn.
+_FUNNEL_CACHE_PATH = ".funnel_cache.json"
+_FUNNEL_CACHE_TTL = 3600.0  # seconds
+
+
+def _funnel_cache_fresh() -> bool:
+    try:
+        with open(_FUNNEL_CACHE_PATH, "r") as f:
+            cached = json.load(f)
+        return (
+            cached.get("port") == TAILSCALE_FUNNEL_PORT
+            and (time.time() - cached.get("ts", 0.0)) < _FUNNEL_CACHE_TTL
+        )
+    except Exception:
+        return False
+
+
+def _write_funnel_cache() -> None:
+    try:
+        with open(_FUNNEL_CACHE_PATH, "w") as f:
+            json.dump({"port": TAILSCALE_FUNNEL_PORT, "ts": time.time()}, f)
+    except Exception as e:
+        print(f"[WARN] Could not write funnel cache: {e}")
+
+
+@functools.lru_cache(maxsize=1)
+def _tailscale_status_cached() -> Optional[Dict[str, Any]]:
+    """
+    Run `tailscale status --json` once and memoize the parsed result for
+    the process lifetime (each call is a fork+exec of the CLI).
+    Returns None when the CLI is missing or the output is unparsable.
+    """
+    try:
+        st = subprocess.run(
+            ["tailscale", "status", "--json"],
+            capture_output=True,
+            text=True,
+            timeout=5,
+        )
+        if st.returncode != 0:
+            return None
+        return json.loads(st.stdout)
+    except Exception:
+        return None
+
+
+async def _run_cli(*cmd: str, timeout: float = 15.0):
+    """
+    Run a CLI command without blocking the event loop.
+    Returns (returncode, stdout, stderr); returncode -1 on timeout.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        out, err = await asyncio.wait_for(proc.communicate(), timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        return -1, "", "timeout"
+    return proc.returncode, out.decode(errors="replace"), err.decode(errors="replace")
+
+
+async def _start_tailscale_service_windows() -> None:
     """
     Ensure Tailscale Windows service is running and logged in.
     Idempotent: safe to call multiple times.
@@ -163,25 +330,16 @@ def _start_tailscale_service_windows() -> None:
 
     try:
         # Start the Windows service (no-op if already running)
-        subprocess.run(
-            ["sc", "start", "Tailscale"],
-            check=False,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-        )
+        await _run_cli("sc", "start", "Tailscale")
 
-        # Check login state
-        st = subprocess.run(["tailscale", "status"], capture_output=True, text=True)
-        output = (st.stdout + st.stderr).lower()
-        logged_in = st.returncode == 0 and "logged out" not in output
+        # Check login state (shared cached `tailscale status --json` call)
+        status = await asyncio.to_thread(_tailscale_status_cached)
+        logged_in = bool(status) and status.get("BackendState") not in (None, "NeedsLogin", "Stopped")
 
         if not logged_in:
             if TAILSCALE_AUTH_KEY:
                 print("[INFO] Logging into Tailscale with auth key...")
-                subprocess.run(
-                    ["tailscale", "up", f"--authkey={TAILSCALE_AUTH_KEY}"],
-                    check=False,
-                )
+                await _run_cli("tailscale", "up", f"--authkey={TAILSCALE_AUTH_KEY}")
             else:
                 print(
                     "[WARN] Tailscale not logged in and no auth key is set. "
@@ -193,21 +351,18 @@ def _start_tailscale_service_windows() -> None:
         print(f"[WARN] Unable to start/login Tailscale: {e}")
 
 
-def _configure_tailscale_funnel() -> None:
+async def _configure_tailscale_funnel() -> bool:
     """
     Configure Tailscale Funnel so that:
 
       - https://<name>.ts.net/        -> http://localhost:5173
       - https://<name>.ts.net/backend -> http://localhost:3000
+
+    The two funnel binds are independent and run concurrently.
     """
     try:
         # 1) Reset any previous funnel config (idempotent)
-        subprocess.run(
-            ["tailscale", "funnel", "reset"],
-            check=False,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-        )
+        await _run_cli("tailscale", "funnel", "reset")
 
         # 2) Root path /  -> localhost:5173 (前端)
         cmd_root = [
@@ -217,13 +372,6 @@ def _configure_tailscale_funnel() -> None:
             "--https=443",
             "localhost:5173",
         ]
-        res_root = subprocess.run(cmd_root, capture_output=True, text=True)
-        if res_root.returncode != 0:
-            print(
-                f"[WARN] `{' '.join(cmd_root)}` failed: "
-                f"{res_root.stderr.strip() or res_root.stdout.strip()}"
-            )
-
         # 3) /backend -> localhost:3000 (后端 API)
         cmd_backend = [
             "tailscale",
@@ -233,35 +381,45 @@ def _configure_tailscale_funnel() -> None:
             "--set-path=/backend",
             "localhost:3000",
         ]
-        res_backend = subprocess.run(cmd_backend, capture_output=True, text=True)
-        if res_backend.returncode != 0:
+        (rc_root, out_root, err_root), (rc_backend, out_backend, err_backend) = await asyncio.gather(
+            _run_cli(*cmd_root),
+            _run_cli(*cmd_backend),
+        )
+        if rc_root != 0:
+            print(
+                f"[WARN] `{' '.join(cmd_root)}` failed: "
+                f"{err_root.strip() or out_root.strip()}"
+            )
+        if rc_backend != 0:
             print(
                 f"[WARN] `{' '.join(cmd_backend)}` failed: "
-                f"{res_backend.stderr.strip() or res_backend.stdout.strip()}"
+                f"{err_backend.strip() or out_backend.strip()}"
             )
 
         # 4) Show funnel status for debugging
-        f_status = subprocess.run(
-            ["tailscale", "funnel", "status"],
-            capture_output=True,
-            text=True,
-        )
-        if f_status.returncode == 0:
-            print("[INFO] Tailscale funnel status:\n" + f_status.stdout)
+        rc, out, err = await _run_cli("tailscale", "funnel", "status")
+        if rc == 0:
+            print("[INFO] Tailscale funnel status:\n" + out)
         else:
             print(
                 "[WARN] `tailscale funnel status` failed: "
-                f"{f_status.stderr.strip() or f_status.stdout.strip()}"
+                f"{err.strip() or out.strip()}"
             )
+        return rc_root == 0 and rc_backend == 0
 
     except FileNotFoundError:
         print("[WARN] `tailscale` CLI not found. Please install Tailscale and ensure it's in PATH.")
     except Exception as e:
         print(f"[WARN] Could not configure Tailscale Funnel: {e}")
+    return False
+
 
+# Set once funnel config succeeds, so __main__ + on_startup (or reload
+# workers) don't re-shell within the same process.
+_funnel_done = False
 
 
-def ensure_funnel_if_enabled() -> None:
+async def ensure_funnel_if_enabled() -> None:
     """
     Called on startup and __main__:
       - Start Tailscale service on Windows; login via .tailscale auth key if needed.
@@ -269,38 +427,85 @@ def ensure_funnel_if_enabled() -> None:
             /        -> http://127.0.0.1:5173
             /backend -> http://127.0.0.1:3000
     """
-    if not ENABLE_TAILSCALE_FUNNEL:
+    global _funnel_done
+    if not ENABLE_TAILSCALE_FUNNEL or _funnel_done:
+        return
+
+    if _funnel_cache_fresh():
+        print("[INFO] Tailscale funnel recently configured; skipping CLI probes.")
+        _funnel_done = True
         return
 
-    _start_tailscale_service_windows()
-    _configure_tailscale_funnel()
+    await _start_tailscale_service_windows()
+    if await _configure_tailscale_funnel():
+        _write_funnel_cache()
+        _funnel_done = True
 
 
 # -------------------- Middleware (debug logging) --------------------
-@app.middleware("http")
-async def debug_logger(request: Request, call_next):
+# Access lines are handed to a QueueHandler; a QueueListener thread does
+# the actual stdout write + flush, so request tasks never contend on the
+# stream lock or pay the flush syscall.
+_ACCESS_LINE = "[DEBUG] %s %s %s -> %d (%.1f ms)"
+_ACCESS_ERR = "[DEBUG] %s %s %s !! %s"
+
+access_logger = logging.getLogger("alfred.access")
+access_logger.propagate = False
+if DEBUG_LOG:
+    access_logger.setLevel(logging.DEBUG)
+    _access_queue: "queue.SimpleQueue" = queue.SimpleQueue()
+    access_logger.addHandler(logging.handlers.QueueHandler(_access_queue))
+    _access_listener = logging.handlers.QueueListener(
+        _access_queue, logging.StreamHandler(sys.stdout)
+    )
+    _access_listener.start()
+
+
+class DebugLoggerMiddleware:
     """
     Lightweight access log when DEBUG_LOG=1.
     Example:
       [DEBUG] 127.0.0.1 GET /health -> 200 (3.2 ms)
+
+    Implemented as a pure ASGI middleware (not BaseHTTPMiddleware) so no
+    Request/Response objects are allocated per call and streaming bodies
+    are not buffered.
     """
-    start = time.perf_counter()
-    try:
-        response = await call_next(request)
-        if DEBUG_LOG:
-            dur_ms = (time.perf_counter() - start) * 1000
-            client = getattr(request.client, "host", "-")
-            print(
-                f"[DEBUG] {client} {request.method} {request.url.path} -> "
-                f"{response.status_code} ({dur_ms:.1f} ms)",
-                flush=True,
-            )
-        return response
-    except Exception as e:
-        if DEBUG_LOG:
-            client = getattr(request.client, "host", "-")
-            print(f"[DEBUG] {client} {request.method} {request.url.path} !! {e}", flush=True)
-        raise
+
+    def __init__(self, app):
+        self.app = app
+
+    # DEBUG_LOG frozen as a default arg: LOAD_FAST instead of a module
+    # global lookup on every request.
+    async def __call__(self, scope, receive, send, _debug=DEBUG_LOG):
+        if scope["type"] != "http" or not _debug:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter_ns()
+        status_code = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        client = scope.get("client")
+        client_host = client[0] if client else "-"
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            access_logger.error(_ACCESS_ERR, client_host, scope["method"], scope["path"], e)
+            raise
+
+        dur_ms = (time.perf_counter_ns() - start) / 1e6
+        access_logger.debug(
+            _ACCESS_LINE, client_host, scope["method"], scope["path"], status_code, dur_ms
+        )
+
+
+app.add_middleware(DebugLoggerMiddleware)
 
 
 # -------------------- User Register & Login --------------------
@@ -308,25 +513,26 @@ async def debug_logger(request: Request, call_next):
 def register(req: RegisterReq, db: Session = Depends(get_db)):
     """
     Register a new user.
-    Stores username + salted SHA-256 hashed password in the DB.
+    Stores username + salted scrypt-hashed password in the DB.
     """
-    username = (req.username or "").strip().lower()
+    username = req.username  # normalized by the model validator
     if not username or not req.password:
         raise HTTPException(status_code=400, detail="username and password are required")
 
-    # Check if user exists
-    existing = db.query(User).filter(User.username == username).first()
-    if existing:
-        raise HTTPException(status_code=409, detail="username already exists")
-
     user = User(
-        id=str(uuid4()),
+        id=secrets.token_hex(16),
         username=username,
         password_hash=hash_password(req.password),
         created_at=datetime.now(timezone.utc),
     )
     db.add(user)
-    db.commit()
+    try:
+        # Let the unique index detect duplicates: one INSERT round-trip
+        # instead of SELECT-then-INSERT.
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="username already exists")
 
     return AuthResp(userId=username)
 
@@ -338,17 +544,22 @@ def login(req: LoginReq, db: Session = Depends(get_db)):
     - Looks up user in DB
     - Verifies password using verify_password()
     """
-    username = (req.username or "").strip().lower()
+    username = req.username  # normalized by the model validator
 
     if not username or not req.password:
         raise HTTPException(status_code=400, detail="username and password are required")
 
-    user = db.query(User).filter(User.username == username).first()
+    user = db.scalar(select(User).where(User.username == username))
     if not user:
         raise HTTPException(status_code=401, detail="Invalid username or password")
 
     if not verify_password(req.password, user.password_hash):
-        raise HTTPException(status_code=401, detail="Invalid username or password")
+        # Rows written before the scrypt switch used single-round salted
+        # SHA-256; accept them and upgrade the hash in place.
+        if not verify_password_legacy(req.password, user.password_hash):
+            raise HTTPException(status_code=401, detail="Invalid username or password")
+        user.password_hash = hash_password(req.password)
+        db.commit()
 
     return AuthResp(userId=username)
 
@@ -380,6 +591,7 @@ def health():
         "db": DATABASE_URL,
         "chat_save": not DISABLE_CHAT_SAVE,
         "model": MEM_MODEL_NAME,
+        "embed_cache": embed_cache_stats(),
         "funnel": {"enabled": ENABLE_TAILSCALE_FUNNEL, "port": TAILSCALE_FUNNEL_PORT},
     }
 
@@ -392,69 +604,138 @@ def get_history(
         db: Session = Depends(get_db),
         _=Depends(auth),
 ):
-    rows = (
-        db.query(Message)
-        .filter(Message.username == userId)
+    # Last N messages, re-ordered ASC inside SQL; only the three columns we
+    # return are fetched, so no ORM Message instances are built.
+    sub = (
+        select(Message.role, Message.text, Message.ts)
+        .where(Message.username == userId)
         .order_by(desc(Message.ts))
         .limit(limit)
-        .all()
+        .subquery()
+    )
+    rows = db.execute(select(sub).order_by(sub.c.ts.asc())).all()
+    # Direct ORJSONResponse: skips jsonable_encoder entirely, and orjson
+    # formats the raw datetimes in C instead of per-row isoformat calls.
+    return ORJSONResponse(
+        {"messages": [{"role": r.role, "text": r.text, "ts": r.ts} for r in rows]}
     )
-    rows = list(reversed(rows))
-    return {"messages": [{"role": r.role, "text": r.text, "ts": iso_datetime(r.ts)} for r in rows]}
 
 
 # -------------------- /save --------------------
+# Messages are queued and committed in batches so one fsync covers many
+# inserts instead of one commit (and one fsync) per request.
+SAVE_FLUSH_INTERVAL = 0.02  # seconds
+SAVE_FLUSH_MAX = 100  # messages per commit
+
+_save_queue: "asyncio.Queue[Message]" = asyncio.Queue()
+
+
+def _flush_save_batch(batch) -> None:
+    with SessionLocal() as db:
+        db.add_all(batch)
+        db.commit()
+
+
+async def _save_flusher() -> None:
+    """
+    Drain the save queue, committing up to SAVE_FLUSH_MAX messages per
+    transaction, waiting at most SAVE_FLUSH_INTERVAL for stragglers.
+    """
+    while True:
+        batch = [await _save_queue.get()]
+        deadline = time.monotonic() + SAVE_FLUSH_INTERVAL
+        while len(batch) < SAVE_FLUSH_MAX:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(_save_queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        try:
+            await asyncio.to_thread(_flush_save_batch, batch)
+        except Exception as e:
+            print(f"[WARN] /save batch commit failed: {e}", flush=True)
+
+
 @app.post("/save")
-def save_message(req: SaveReq, request: Request, db: Session = Depends(get_db), _=Depends(auth)):
+async def save_message(req: SaveReq, request: Request, _=Depends(auth)):
     """
     Persist chat messages when DISABLE_CHAT_SAVE=0.
     """
     if DEBUG_LOG:
-        print("\n[REQ] /save -----------------", flush=True)
-        print("Headers:", dict(request.headers), flush=True)
-        print("Body:", req.model_dump(), flush=True)
-        print("[REQ END] -------------------\n", flush=True)
+        # Lazy %-formatting: the record is cheap to build and skips the
+        # full header-dict copy + body JSON dump the old print did.
+        save_logger.debug(
+            "save user=%s role=%s bytes=%d", req.userId, req.role, len(req.text)
+        )
 
     if DISABLE_CHAT_SAVE:
         return {"ok": True, "skipped": "chat-saving disabled"}
 
-    role = req.role.lower()
-    if role not in {"user", "assistant", "system"}:
-        raise HTTPException(status_code=400, detail="role must be user|assistant|system")
-
     msg = Message(
-        id=str(uuid4()),
+        id=secrets.token_hex(16),
         username =req.userId,
         chat_id=req.chatId,
-        role=role,
+        role=req.role,
         text=req.text,
         ts=parse_ts(req.ts),
         meta=req.meta,
     )
-    db.add(msg)
-    db.commit()
-    return {"ok": True}
+    await _save_queue.put(msg)
+    return {"ok": True, "queued": True}
 
 
 # -------------------- Startup --------------------
 @app.on_event("startup")
-def on_startup():
-    init_db()
-    # Optional: preload embedding model to avoid first-request latency
-    load_model()
+async def on_startup():
+    # init_db (disk I/O) and the embedding-model preload (hundreds of MB of
+    # weights) are independent, so overlap them in worker threads; startup
+    # costs max() of the two instead of their sum. The preload is opt-in:
+    # without it the first /mem0/* request triggers the lazy load and
+    # processes that never embed skip torch entirely.
+    startup_jobs = [asyncio.to_thread(init_db)]
+    if os.getenv("PRELOAD_MODEL", "0") == "1":
+        startup_jobs.append(asyncio.to_thread(load_model))
+    await asyncio.gather(*startup_jobs)
 
     print("[INFO] Alfred backend ready.")
     print(f"[INFO] Database: {DATABASE_URL}")
     print(f"[INFO] Auth: {'ON' if AUTH_TOKEN else 'OFF'}")
     print(f"[INFO] Chat saving: {'DISABLED' if DISABLE_CHAT_SAVE else 'ENABLED'}")
 
-    # Best-effort: enable Tailscale Serve + Funnel
-    ensure_funnel_if_enabled()
+    # Background flusher for batched /save commits
+    if not DISABLE_CHAT_SAVE:
+        asyncio.create_task(_save_flusher())
+
+    # Best-effort: enable Tailscale Serve + Funnel in the background so it
+    # never delays the first request
+    asyncio.create_task(ensure_funnel_if_enabled())
 
 
 if __name__ == "__main__":
     import uvicorn
 
+    # Prefer the C event loop / HTTP parser when installed (uvloop is not
+    # available on Windows, so fall back gracefully).
+    try:
+        import uvloop  # noqa: F401
+        loop_impl = "uvloop"
+    except ImportError:
+        loop_impl = "asyncio"
+    try:
+        import httptools  # noqa: F401
+        http_impl = "httptools"
+    except ImportError:
+        http_impl = "h11"
+
     # Best-effort: enable Tailscale Serve + Funnel before binding the port
-    ensure_funnel_if_enabled()
-    uvicorn.run("backend.app:app", host="0.0.0.0", port=PORT, reload=True)
+    asyncio.run(ensure_funnel_if_enabled())
+    uvicorn.run(
+        "backend.app:app",
+        host="0.0.0.0",
+        port=PORT,
+        loop=loop_impl,
+        http=http_impl,
+        reload=os.getenv("UVICORN_RELOAD", "0") == "1",
+    )
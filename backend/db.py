@@ -1,7 +1,7 @@
 # /backend/db.py
 import os
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 load_dotenv()
@@ -11,7 +11,27 @@ DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./alfred.db")
 engine = create_engine(
     DATABASE_URL,
     connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {},
+    # Keep a generous connection pool and a larger compiled-statement cache
+    # so hot queries reuse their compiled SQL instead of recompiling.
+    pool_size=20,
+    max_overflow=40,
+    pool_pre_ping=False,
+    query_cache_size=1200,
 )
+if DATABASE_URL.startswith("sqlite"):
+    @event.listens_for(engine, "connect")
+    def _sqlite_pragmas(dbapi_con, _):
+        # WAL + synchronous=NORMAL drops the per-commit rollback-journal
+        # fsync; mmap lets the embedding BLOB reads skip pread syscalls;
+        # cache_size is in KiB when negative (-64000 = 64 MB page cache).
+        cur = dbapi_con.cursor()
+        cur.execute("PRAGMA journal_mode=WAL")
+        cur.execute("PRAGMA synchronous=NORMAL")
+        cur.execute("PRAGMA temp_store=MEMORY")
+        cur.execute("PRAGMA mmap_size=268435456")
+        cur.execute("PRAGMA cache_size=-64000")
+        cur.close()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -33,7 +33,8 @@ class Memory(Base):
     Local Long-Term Memory (Mem0 Style)
     - text: A one-sentence "executable fact/preference"
     - tags: Optional list of tags
-    - embedding: L2-normalized float32 vector (bytes)
+    - embedding: L2-normalized vector (bytes); int8-quantized with a fixed
+      1/127 scale for new rows, raw float32 for legacy rows
     """
     __tablename__ = "memories"
     id = Column(String, primary_key=True)  # uuid
@@ -44,4 +45,7 @@ class Memory(Base):
     embedding = Column(LargeBinary, nullable=False)
 
 
-Index("ix_memories_username _created_at", Memory.username , Memory.created_at.desc())
+Index("ix_memories_username_created_at", Memory.username, Memory.created_at.desc())
+Index("ix_messages_username_ts", Message.username, Message.ts.desc())
+# Exact-text dedup precheck in _save_memory hits this index
+Index("ix_memories_username_text", Memory.username, Memory.text)
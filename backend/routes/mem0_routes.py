@@ -1,20 +1,38 @@
 # /backend/routes/mem0_routes.py
+import asyncio
+import functools
+import hashlib
 import os
+import queue
 import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import List, Optional, Dict, Any, Tuple
 
 from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from uuid import uuid4
 
 import numpy as np
+
+try:
+    import faiss  # SIMD inner-product kernels; optional
+except ImportError:
+    faiss = None
+try:
+    import simsimd  # AVX-512/NEON dot kernels; optional
+except ImportError:
+    simsimd = None
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
 
-from db import get_db
+from db import get_db, SessionLocal
 from models import Memory
-from utils import embed, parse_ts, iso_datetime, DEBUG_LOG, auth
+from utils import embed, embed_async, parse_ts, DEBUG_LOG, auth
 
 router = APIRouter(tags=["mem0"])
 
@@ -50,11 +68,297 @@ class MemAutoReq(BaseModel):
 
 
 # ===== Auxiliary Functions =====
+# Embeddings are L2-normalized (components in [-1, 1]), so symmetric int8
+# with a fixed 1/127 scale loses almost no cosine precision while shrinking
+# each blob 4x (384 B vs 1536 B). Legacy float32 rows are told apart by
+# blob length: int8 rows are exactly _EMBED_DIM bytes.
+_EMBED_DIM = 384  # all-MiniLM-L6-v2
+_INT8_SCALE = np.float32(1.0 / 127.0)
+
+
+def _quantize(vec: np.ndarray) -> bytes:
+    return np.clip(np.round(vec * 127.0), -127, 127).astype(np.int8).tobytes()
+
+
 def _from_bytes(b: bytes) -> np.ndarray:
+    if len(b) == _EMBED_DIM:
+        return np.frombuffer(b, dtype=np.int8).astype(np.float32) * _INT8_SCALE
     return np.frombuffer(b, dtype=np.float32)
 
 
+# ===== Per-user embedding matrix cache =====
+# All vectors of one user stacked into a contiguous (N, D) float32 matrix so
+# cosine scoring is a single BLAS GEMV (`M @ q_vec`) instead of N Python-level
+# np.dot calls. When faiss is installed the matrix is also wrapped in an
+# IndexFlatIP so search/dedup use its SIMD kernels. Invalidated whenever
+# that user's memories change.
+_matrix_lock = threading.Lock()
+_user_matrix: Dict[str, Tuple[np.ndarray, List[str], Optional[Any]]] = {}
+
+# Above this many memories a user's index switches from exact IndexFlatIP
+# to HNSW (M=32), trading exactness for O(log N) queries.
+_HNSW_THRESHOLD = 10_000
+
+
+# Above this many rows the flat scan is split into contiguous slices
+# dispatched across a small thread pool (numpy and simsimd both release
+# the GIL inside the kernel). Built lazily so processes that never score
+# big matrices spawn no threads.
+_PARALLEL_SCAN_N = 10_000
+_scan_pool: Optional[ThreadPoolExecutor] = None
+_scan_pool_lock = threading.Lock()
+
+
+def _get_scan_pool() -> ThreadPoolExecutor:
+    global _scan_pool
+    if _scan_pool is None:
+        with _scan_pool_lock:
+            if _scan_pool is None:
+                _scan_pool = ThreadPoolExecutor(
+                    max_workers=max(2, (os.cpu_count() or 2) // 2),
+                    thread_name_prefix="scan",
+                )
+    return _scan_pool
+
+
+def _score_chunk(M: np.ndarray, q_vec: np.ndarray) -> np.ndarray:
+    if simsimd is not None:
+        return np.asarray(
+            simsimd.cdist(q_vec[None, :], M, metric="dot"), dtype=np.float32
+        )[0]
+    return M @ q_vec
+
+
+def _score_all(M: np.ndarray, q_vec: np.ndarray) -> np.ndarray:
+    """
+    Dot every row of M against q_vec. Prefers simsimd's hand-tuned
+    kernels (lower per-call overhead than BLAS dispatch at D=384),
+    falling back to the plain GEMV; large matrices are scanned in
+    parallel row slices.
+    """
+    n = M.shape[0]
+    if n < _PARALLEL_SCAN_N:
+        return _score_chunk(M, q_vec)
+
+    pool = _get_scan_pool()
+    workers = pool._max_workers
+    step = (n + workers - 1) // workers
+    parts = pool.map(
+        _score_chunk,
+        [M[i : i + step] for i in range(0, n, step)],
+        [q_vec] * ((n + step - 1) // step),
+    )
+    return np.concatenate(list(parts))
+
+
+def _get_user_matrix(db: Session, username: str) -> Tuple[Optional[np.ndarray], List[str], Optional[Any]]:
+    with _matrix_lock:
+        cached = _user_matrix.get(username)
+    if cached is not None:
+        return cached
+
+    rows = db.query(Memory.id, Memory.embedding).filter(Memory.username == username).all()
+    if not rows:
+        return None, [], None
+
+    ids = [r.id for r in rows]
+    first = _from_bytes(rows[0].embedding)
+    M = np.empty((len(rows), first.shape[0]), dtype=np.float32)
+    M[0] = first
+    for i in range(1, len(rows)):
+        M[i] = _from_bytes(rows[i].embedding)
+
+    index = None
+    if faiss is not None:
+        if len(rows) >= _HNSW_THRESHOLD:
+            # Sub-linear ANN for big users; exact flat scan below that,
+            # where brute force is both faster to build and exact.
+            index = faiss.IndexHNSWFlat(M.shape[1], 32, faiss.METRIC_INNER_PRODUCT)
+        else:
+            index = faiss.IndexFlatIP(M.shape[1])
+        index.add(M)
+
+    with _matrix_lock:
+        _user_matrix[username] = (M, ids, index)
+    return M, ids, index
+
+
+def _invalidate_user_matrix(username: str) -> None:
+    with _matrix_lock:
+        _user_matrix.pop(username, None)
+    _qv_invalidate(username)
+
+
+def _append_to_matrix(username: str, q_vec: np.ndarray, mem_id: str) -> None:
+    """
+    Extend a cached matrix in place of a full invalidate+rebuild, so search
+    sees a write-behind memory before its commit lands.
+    """
+    with _matrix_lock:
+        cached = _user_matrix.get(username)
+        if cached is None:
+            return
+        M, ids, index = cached
+        if index is not None:
+            index.add(q_vec.reshape(1, -1))
+        _user_matrix[username] = (np.vstack((M, q_vec[None, :])), ids + [mem_id], index)
+    _qv_invalidate(username)
+
+
+# ===== Binary sign prefilter =====
+# For big users without faiss, a Hamming scan over packed sign bits
+# (48 B/row vs 1536 B) picks a small candidate set that the exact GEMV
+# then rescores — 32x less bandwidth on the first stage. Signs of
+# normalized vectors preserve cosine ordering well enough for a
+# generous candidate multiplier. Keyed by matrix identity, so any
+# rebuild/append of the cached matrix naturally refreshes the bits.
+_BINARY_PREFILTER_N = 4096
+_bits_lock = threading.Lock()
+_user_bits: Dict[str, Tuple[Any, np.ndarray]] = {}
+
+
+def _get_user_bits(username: str, M: np.ndarray) -> np.ndarray:
+    with _bits_lock:
+        cached = _user_bits.get(username)
+        if cached is not None and cached[0] is M:
+            return cached[1]
+    bits = np.packbits(M > 0, axis=1)
+    with _bits_lock:
+        _user_bits[username] = (M, bits)
+    return bits
+
+
+# ===== Query-result similarity cache =====
+# Near-duplicate queries ("what music do I like" asked two ways) skip the
+# full matrix scan and row hydration: cached query vectors are scored with
+# one tiny GEMV and any hit above the cosine threshold replays the stored
+# items. Entries are dropped whenever the user's memories change.
+_QV_THRESHOLD = float(os.getenv("MEM_QV_THRESHOLD", "0.97"))
+_QV_MAX = 128  # cached queries per user
+_qv_lock = threading.Lock()
+_qv_cache: Dict[str, "OrderedDict[str, Tuple[np.ndarray, int, List[dict]]]"] = {}
+
+
+def _qv_lookup(username: str, q_vec: np.ndarray, top_k: int) -> Optional[List[dict]]:
+    with _qv_lock:
+        entries = _qv_cache.get(username)
+        if not entries:
+            return None
+        keys = list(entries.keys())
+        sims = np.stack([entries[k][0] for k in keys]) @ q_vec
+        best = int(np.argmax(sims))
+        if float(sims[best]) < _QV_THRESHOLD:
+            return None
+        _, cached_k, items = entries[keys[best]]
+        if cached_k < top_k:
+            # Cached result is narrower than what's asked for; miss.
+            return None
+        entries.move_to_end(keys[best])
+        return items[:top_k]
+
+
+def _qv_store(username: str, query: str, q_vec: np.ndarray, top_k: int, items: List[dict]) -> None:
+    with _qv_lock:
+        entries = _qv_cache.setdefault(username, OrderedDict())
+        entries[query] = (q_vec, top_k, items)
+        entries.move_to_end(query)
+        while len(entries) > _QV_MAX:
+            entries.popitem(last=False)
+
+
+def _qv_invalidate(username: str) -> None:
+    with _qv_lock:
+        _qv_cache.pop(username, None)
+
+
+# ===== Write-behind queue (opt-in) =====
+# MEM_WRITE_BEHIND=1 buffers /mem0 inserts so one WAL fsync covers a burst
+# of memories instead of one commit per write; mirrors the /save flusher.
+MEM_WRITE_BEHIND = os.getenv("MEM_WRITE_BEHIND", "0") == "1"
+MEM_FLUSH_INTERVAL = 0.02  # seconds
+MEM_FLUSH_MAX = 64  # rows per commit
+
+_mem_write_queue: "queue.Queue[Memory]" = queue.Queue()
+_mem_flusher_started = False
+_mem_flusher_lock = threading.Lock()
+
+
+def _mem_write_flusher() -> None:
+    while True:
+        batch = [_mem_write_queue.get()]
+        deadline = time.monotonic() + MEM_FLUSH_INTERVAL
+        while len(batch) < MEM_FLUSH_MAX:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_mem_write_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        try:
+            with SessionLocal() as db:
+                db.add_all(batch)
+                db.commit()
+        except Exception as e:
+            print(f"[WARN] memory batch commit failed: {e}", flush=True)
+
+
+def _enqueue_memory(mem: Memory) -> None:
+    global _mem_flusher_started
+    if not _mem_flusher_started:
+        with _mem_flusher_lock:
+            if not _mem_flusher_started:
+                threading.Thread(target=_mem_write_flusher, daemon=True, name="mem-flush").start()
+                _mem_flusher_started = True
+    _mem_write_queue.put(mem)
+
+
 # ===== Internal memory storage logic =====
+# Hashes of texts known to exist, filled in as saves and dup hits happen,
+# so repeat texts skip even the indexed SELECT. Only hits are trusted: a
+# missing hash still falls through to the DB check.
+_text_hash_lock = threading.Lock()
+_user_text_hashes: Dict[str, Dict[bytes, str]] = {}
+
+
+def _text_hash(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def _remember_text(username: str, text: str, mem_id: str) -> None:
+    with _text_hash_lock:
+        _user_text_hashes.setdefault(username, {})[_text_hash(text)] = mem_id
+
+
+def _forget_texts(username: str) -> None:
+    with _text_hash_lock:
+        _user_text_hashes.pop(username, None)
+
+
+def _exact_dup(db: Session, username: str, text: str) -> Optional[Dict[str, Any]]:
+    """
+    Cheap exact-text dedup check; lets callers skip the embed + vector
+    scan entirely for verbatim repeats ("remind me daily" flows).
+    Checks the in-memory hash map first, then the (username, text) index.
+    """
+    h = _text_hash(text)
+    with _text_hash_lock:
+        known = _user_text_hashes.get(username)
+        mem_id = known.get(h) if known else None
+    if mem_id is not None:
+        return {"ok": True, "skipped": "duplicate", "dup_id": mem_id, "score": 1.0}
+
+    row = (
+        db.query(Memory.id)
+        .filter(Memory.username == username, Memory.text == text)
+        .first()
+    )
+    if row:
+        _remember_text(username, text, row.id)
+        return {"ok": True, "skipped": "duplicate", "dup_id": row.id, "score": 1.0}
+    return None
+
+
 def _save_memory(
     db: Session,
     username : str,
@@ -62,6 +366,7 @@ def _save_memory(
     tags: Optional[List[str]] = None,
     created_ts: Optional[str] = None,
     dedupe_threshold: float = 0.9,
+    q_vec: Optional[np.ndarray] = None,
 ) -> Dict[str, Any]:
     # 🔥 username lower
     username = (username or "").strip().lower()
@@ -72,25 +377,32 @@ def _save_memory(
     if not text:
         raise HTTPException(status_code=400, detail="text is required")
 
-    q_vec = embed([text])[0]
-    mems = db.query(Memory).filter(Memory.username == username ).all()
-
-    best_score = -1.0
-    best_id = None
-    for m in mems:
-        v = _from_bytes(m.embedding)
-        score = float(np.dot(q_vec, v))
-        if score > best_score:
-            best_score = score
-            best_id = m.id
-
-    if best_score >= dedupe_threshold:
-        return {
-            "ok": True,
-            "skipped": "duplicate",
-            "dup_id": best_id,
-            "score": round(best_score, 4),
-        }
+    # async endpoints pass a vector computed on the embedding executor
+    if q_vec is None:
+        # Verbatim repeat: one indexed lookup beats an encode + GEMV
+        dup = _exact_dup(db, username, text)
+        if dup is not None:
+            return dup
+        q_vec = embed([text])[0]
+
+    # Dedup against all existing vectors in one GEMV (or faiss top-1)
+    M, ids, index = _get_user_matrix(db, username)
+    if M is not None:
+        if index is not None:
+            top_scores, top_idx = index.search(q_vec.reshape(1, -1), 1)
+            best = int(top_idx[0][0])
+            best_score = float(top_scores[0][0])
+        else:
+            scores = _score_all(M, q_vec)
+            best = int(np.argmax(scores))
+            best_score = float(scores[best])
+        if best_score >= dedupe_threshold:
+            return {
+                "ok": True,
+                "skipped": "duplicate",
+                "dup_id": ids[best],
+                "score": round(best_score, 4),
+            }
 
     mem = Memory(
         id=str(uuid4()),
@@ -98,10 +410,18 @@ def _save_memory(
         text=text,
         tags=tags or [],
         created_at=parse_ts(created_ts),
-        embedding=q_vec.tobytes(),
+        embedding=_quantize(q_vec),
     )
-    db.add(mem)
-    db.commit()
+    if MEM_WRITE_BEHIND:
+        # Eventual consistency: id is returned before the commit lands, and
+        # the cached matrix is extended so search already sees the vector.
+        _enqueue_memory(mem)
+        _append_to_matrix(username, q_vec, mem.id)
+    else:
+        db.add(mem)
+        db.commit()
+        _invalidate_user_matrix(username)
+    _remember_text(username, text, mem.id)
     return {"ok": True, "id": mem.id}
 
 
@@ -111,87 +431,138 @@ _HABIT_WORDS = ["every day", "each morning", "each night", "routine", "habit", "
 _EVENT_WORDS = ["appointment", "meeting", "visit", "birthday", "doctor", "dentist"]
 _RULE_WORDS = ["remember", "from now on", "always", "never", "please", "remind", "avoid"]
 
+
+# Every keyword mapped to its categories, all matched in ONE scan of the
+# utterance (single alternation, longest-first so "dislike" wins over
+# "like" at the same offset). Substring semantics as before.
+_WORD_CATS: Dict[str, Tuple[str, ...]] = {}
+for _w in _PREF_WORDS:
+    _WORD_CATS[_w] = ("pref",)
+for _w in _HABIT_WORDS:
+    _WORD_CATS[_w] = ("habit",)
+for _w in _EVENT_WORDS:
+    _WORD_CATS[_w] = ("event",)
+for _w in _RULE_WORDS:
+    _WORD_CATS[_w] = ("rule",)
+for _w in ["music", "song", "piano"]:
+    _WORD_CATS[_w] = ("music",)
+for _w in ["sleep", "bed"]:
+    _WORD_CATS[_w] = ("sleep",)
+for _w in ["coffee", "tea", "food"]:
+    _WORD_CATS[_w] = ("food",)
+_WORD_CATS["medicine"] = ("health",)
+_WORD_CATS["doctor"] = ("event", "health")  # in both keyword lists
+
+_KEYWORD_RE = re.compile(
+    "|".join(sorted(map(re.escape, _WORD_CATS), key=len, reverse=True))
+)
+
+
+def _keyword_hits(u_lower: str) -> set:
+    hits: set = set()
+    for m in _KEYWORD_RE.finditer(u_lower):
+        hits.update(_WORD_CATS[m.group()])
+    return hits
+
 DATE_RE = re.compile(r"(20\d{2}-\d{2}-\d{2})")
 TIME_RE = re.compile(r"\b([01]?\d|2[0-3]):([0-5]\d)\b")
 
-_NAME_PATTERNS = [
-    re.compile(r"\bmy name is\s+([A-Za-z][A-Za-z0-9_\- ]{1,40})", re.I),
-    re.compile(r"\bi am\s+([A-Za-z][A-Za-z0-9_\- ]{1,40})", re.I),
-    re.compile(r"\bi'm\s+([A-Za-z][A-Za-z0-9_\- ]{1,40})", re.I),
-    re.compile(r"(?:我叫|我是)\s*([A-Za-z\u4e00-\u9fa5][A-Za-z0-9_\-\u4e00-\u9fa5 ]{0,40})", re.I),
-]
+# One combined pattern: a single scan finds the leftmost name introduction
+# instead of four sequential full-string searches.
+_NAME_RE = re.compile(
+    r"\b(?:my name is|i am|i'm)\s+([A-Za-z][A-Za-z0-9_\- ]{1,40})"
+    r"|(?:我叫|我是)\s*([A-Za-z\u4e00-\u9fa5][A-Za-z0-9_\-\u4e00-\u9fa5 ]{0,40})",
+    re.I,
+)
+_WS_RE = re.compile(r"\s+")
 
 
 def _classify_and_summarize(utterance: str) -> Tuple[bool, str, List[str]]:
+    # The cached variant returns an immutable tags tuple; hand callers a
+    # fresh list so they can't mutate the cached entry.
+    should, summary, tags = _classify_cached(utterance)
+    return should, summary, list(tags)
+
+
+# Pure function of the utterance, and real traffic repeats phrasings
+# ("remind me to take my medicine"), so repeats skip every regex pass.
+@functools.lru_cache(maxsize=4096)
+def _classify_cached(utterance: str) -> Tuple[bool, str, Tuple[str, ...]]:
     u = (utterance or "").strip()
     if not u:
-        return False, "", []
+        return False, "", ()
 
     u_lower = u.lower()
+    # Dedup at append time (set guard) instead of a rebuild pass at the end
+    seen: set = set()
     tags: List[str] = []
+
+    def _add(t: str) -> None:
+        if t not in seen:
+            seen.add(t)
+            tags.append(t)
+
+    hits = _keyword_hits(u_lower)
     should = False
 
-    if any(w in u_lower for w in _PREF_WORDS):
+    if "pref" in hits:
         should = True
-        tags.append("preference")
-    if any(w in u_lower for w in _HABIT_WORDS):
+        _add("preference")
+    if "habit" in hits:
         should = True
-        tags.extend(["habit", "schedule"])
-    if any(w in u_lower for w in _EVENT_WORDS):
+        _add("habit")
+        _add("schedule")
+    if "event" in hits:
         should = True
-        tags.append("event")
-    if any(w in u_lower for w in _RULE_WORDS):
+        _add("event")
+    if "rule" in hits:
         should = True
-        if "preference" not in tags:
-            tags.append("preference")
-
-    date_match = DATE_RE.search(u)
-    time_match = TIME_RE.search(u)
-    dt_text = ""
-    if date_match:
-        dt_text = date_match.group(1)
-    if time_match:
-        t = ":".join(time_match.groups())
-        dt_text = (dt_text + " " + t).strip()
+        _add("preference")
 
     summary = ""
     if should:
+        # Date/time extraction only matters for the summary, so skip the
+        # regex scans entirely for non-memory-worthy utterances.
+        date_match = DATE_RE.search(u)
+        time_match = TIME_RE.search(u)
+        dt_text = ""
+        if date_match:
+            dt_text = date_match.group(1)
+        if time_match:
+            t = ":".join(time_match.groups())
+            dt_text = (dt_text + " " + t).strip()
+
         summary = f"{dt_text} {u}".strip() if dt_text else u
         if len(summary) > 120:
             summary = summary[:117] + "..."
 
-        if any(x in u_lower for x in ["music", "song", "piano"]):
-            tags.append("music")
-        if any(x in u_lower for x in ["sleep", "bed"]):
-            tags.append("sleep")
-        if any(x in u_lower for x in ["coffee", "tea", "food"]):
-            tags.append("food")
-        if any(x in u_lower for x in ["doctor", "medicine"]):
-            tags.append("health")
+        if "music" in hits:
+            _add("music")
+        if "sleep" in hits:
+            _add("sleep")
+        if "food" in hits:
+            _add("food")
+        if "health" in hits:
+            _add("health")
 
-        # Remove duplicates but preserve order
-        seen = set()
-        tags = [t for t in tags if not (t in seen or seen.add(t))]
-
-    return should, summary, tags
+    return should, summary, tuple(tags)
 
 
+@functools.lru_cache(maxsize=1024)
 def _infer_username_from_utterance(utter: str) -> Optional[str]:
     u = (utter or "").strip()
-    for pat in _NAME_PATTERNS:
-        m = pat.search(u)
-        if m:
-            name = m.group(1).strip()
-            name = re.sub(r"\s+", " ", name)
-            name = name.strip(".,!?:;，。！？：；")
-            if name:
-                return name
+    for m in _NAME_RE.finditer(u):
+        name = (m.group(1) or m.group(2) or "").strip()
+        name = _WS_RE.sub(" ", name)
+        name = name.strip(".,!?:;，。！？：；")
+        if name:
+            return name
     return None
 
 
 # ===== mem0 endpoints =====
 @router.post("/mem0/add")
-def mem0_add(req: MemAddReq, request: Request, db: Session = Depends(get_db), _=Depends(auth)):
+async def mem0_add(req: MemAddReq, request: Request, db: Session = Depends(get_db), _=Depends(auth)):
     if DEBUG_LOG:
         print("\n[REQ] /mem0/add -----------------", flush=True)
         print("Headers:", dict(request.headers), flush=True)
@@ -202,19 +573,27 @@ def mem0_add(req: MemAddReq, request: Request, db: Session = Depends(get_db), _=
     if not username :
         raise HTTPException(status_code=400, detail="userId is required")
 
-    result = _save_memory(
+    text = (req.text or "").strip()
+    if text:
+        dup = await asyncio.to_thread(_exact_dup, db, username, text)
+        if dup is not None:
+            return dup
+    q_vec = (await embed_async([text]))[0] if text else None
+    result = await asyncio.to_thread(
+        _save_memory,
         db=db,
         username =username ,
         text=req.text,
         tags=req.tags,
         created_ts=req.ts,
         dedupe_threshold=0.9,
+        q_vec=q_vec,
     )
     return result
 
 
 @router.post("/mem0/search")
-def mem0_search(req: MemSearchReq, request: Request, db: Session = Depends(get_db), _=Depends(auth)):
+async def mem0_search(req: MemSearchReq, request: Request, db: Session = Depends(get_db), _=Depends(auth)):
     if DEBUG_LOG:
         print("\n[REQ] /mem0/search -----------------", flush=True)
         print("Headers:", dict(request.headers), flush=True)
@@ -229,50 +608,83 @@ def mem0_search(req: MemSearchReq, request: Request, db: Session = Depends(get_d
 
     # no query: return latest memories
     if not req.query or not req.query.strip():
-        items = (
+        items = await asyncio.to_thread(
             db.query(Memory)
             .filter(Memory.username == username )
             .order_by(desc(Memory.created_at))
             .limit(top_k)
-            .all()
+            .all
+        )
+        return ORJSONResponse(
+            {
+                "items": [
+                    {
+                        "id": m.id,
+                        "text": m.text,
+                        "tags": m.tags or [],
+                        "created_at": m.created_at,  # formatted by orjson in C
+                        "score": None,
+                    }
+                    for m in items
+                ]
+            }
         )
-        return {
-            "items": [
-                {
-                    "id": m.id,
-                    "text": m.text,
-                    "tags": m.tags or [],
-                    "created_at": iso_datetime(m.created_at),
-                    "score": None,
-                }
-                for m in items
-            ]
-        }
-
-    q_vec = embed([req.query])[0]
-    mems = db.query(Memory).filter(Memory.username == username ).all()
-
-    scored: List[Tuple[float, Memory]] = []
-    for m in mems:
-        v = _from_bytes(m.embedding)
-        score = float(np.dot(q_vec, v))
-        scored.append((score, m))
-
-    scored.sort(key=lambda x: x[0], reverse=True)
-    top = scored[:top_k]
 
-    return {
-        "items": [
+    q_vec = (await embed_async([req.query]))[0]
+
+    cached_items = _qv_lookup(username, q_vec, top_k)
+    if cached_items is not None:
+        return ORJSONResponse({"items": cached_items})
+
+    M, ids, index = await asyncio.to_thread(_get_user_matrix, db, username)
+    if M is None:
+        return ORJSONResponse({"items": []})
+
+    k = min(top_k, len(ids))
+    if index is not None:
+        top_scores, top_idx = index.search(q_vec.reshape(1, -1), k)
+        top_scores, top_idx = top_scores[0], top_idx[0]
+    elif len(ids) >= _BINARY_PREFILTER_N:
+        # Hamming prefilter over packed sign bits, exact rescore on the
+        # survivors only.
+        bits = _get_user_bits(username, M)
+        q_bits = np.packbits(q_vec > 0)
+        hamming = np.bitwise_count(bits ^ q_bits).sum(axis=1, dtype=np.int32)
+        n_cand = min(len(ids), max(32, 8 * k))
+        cand = np.argpartition(hamming, n_cand - 1)[:n_cand]
+        scores = _score_all(M[cand], q_vec)
+        order = np.argpartition(-scores, k - 1)[:k]
+        order = order[np.argsort(-scores[order])]
+        top_idx = cand[order]
+        top_scores = scores[order]
+    else:
+        # One pass over all vectors, then partial top-k selection:
+        # argpartition is O(N) vs O(N log N) for a full sort.
+        scores = _score_all(M, q_vec)
+        top_idx = np.argpartition(-scores, k - 1)[:k]
+        top_idx = top_idx[np.argsort(-scores[top_idx])]
+        top_scores = scores[top_idx]
+
+    top_ids = [ids[i] for i in top_idx]
+    mems = await asyncio.to_thread(db.query(Memory).filter(Memory.id.in_(top_ids)).all)
+    by_id = {m.id: m for m in mems}
+
+    items = []
+    for i, score in zip(top_idx, top_scores):
+        m = by_id.get(ids[i])
+        if m is None:
+            continue
+        items.append(
             {
                 "id": m.id,
                 "text": m.text,
                 "tags": m.tags or [],
-                "created_at": iso_datetime(m.created_at),
-                "score": round(score, 4),
+                "created_at": m.created_at,  # formatted by orjson in C
+                "score": round(float(score), 4),
             }
-            for score, m in top
-        ]
-    }
+        )
+    _qv_store(username, req.query, q_vec, top_k, items)
+    return ORJSONResponse({"items": items})
 
 
 @router.post("/mem0/delete")
@@ -293,6 +705,8 @@ def mem0_delete(req: MemDeleteReq, request: Request, db: Session = Depends(get_d
 
     db.delete(m)
     db.commit()
+    _invalidate_user_matrix(username)
+    _forget_texts(username)
     return {"ok": True}
 
 
@@ -310,11 +724,13 @@ def mem0_clear(req: MemClearReq, request: Request, db: Session = Depends(get_db)
 
     db.query(Memory).filter(Memory.username == username ).delete()
     db.commit()
+    _invalidate_user_matrix(username)
+    _forget_texts(username)
     return {"ok": True, "cleared": True}
 
 
 @router.post("/mem0/auto")
-def mem0_auto(
+async def mem0_auto(
     req: MemAutoReq,
     request: Request,
     db: Session = Depends(get_db),
@@ -368,14 +784,19 @@ def mem0_auto(
             "tags": tags or [],
         }
 
-    result = _save_memory(
-        db=db,
-        username =username ,
-        text=summary,
-        tags=tags,
-        created_ts=None,
-        dedupe_threshold=dedupe_th,
-    )
+    result = await asyncio.to_thread(_exact_dup, db, username, summary)
+    if result is None:
+        q_vec = (await embed_async([summary]))[0]
+        result = await asyncio.to_thread(
+            _save_memory,
+            db=db,
+            username =username ,
+            text=summary,
+            tags=tags,
+            created_ts=None,
+            dedupe_threshold=dedupe_th,
+            q_vec=q_vec,
+        )
 
     resp: Dict[str, Any] = {
         "ok": True,
@@ -1,78 +1,252 @@
 # /backend/utils.py
+import asyncio
+import hashlib
+import hmac
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import Any, List, Optional
 
 import numpy as np
 from dotenv import load_dotenv
+
+try:
+    from ciso8601 import parse_datetime  # C extension, ~10x fromisoformat
+except ImportError:
+    parse_datetime = None
 from fastapi import Header, HTTPException
-from sentence_transformers import SentenceTransformer
 
 # Load .env once here so all modules see env vars
 load_dotenv()
 
 DEBUG_LOG = os.getenv("DEBUG_LOG", "0") == "1"
 MEM_MODEL_NAME = os.getenv("MEM_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+# "onnx" runs the encoder through onnxruntime with the dynamically int8-
+# quantized weights shipped with the model (needs optimum+onnxruntime);
+# falls back to the plain torch backend if that fails.
+MEM_MODEL_BACKEND = os.getenv("MEM_MODEL_BACKEND", "onnx")
 AUTH_TOKEN = os.getenv("AUTH_TOKEN", "")
 
-_model: Optional[SentenceTransformer] = None
+# Loaded lazily (and the sentence_transformers import itself is deferred:
+# it pulls in torch, which costs seconds and ~300MB even when unused).
+_model = None
+_model_lock = threading.Lock()
 
 
 # -------------------- Auth --------------------
+# The full expected header is precomputed once so the per-request check is
+# a single constant-time comparison (no startswith/split/== triple).
+# Compared as bytes: compare_digest raises TypeError on non-ASCII str
+# input, and Starlette decodes headers as latin-1, so a client can send
+# such bytes.
+_EXPECTED_AUTH = f"Bearer {AUTH_TOKEN}".encode() if AUTH_TOKEN else None
+
+
 def auth(authorization: Optional[str] = Header(None)) -> None:
     """
     Simple bearer token auth.
     If AUTH_TOKEN is not set, auth is effectively disabled.
     """
-    if not AUTH_TOKEN:
+    if _EXPECTED_AUTH is None:
         return
 
-    if not authorization or not authorization.startswith("Bearer "):
+    if not authorization:
         raise HTTPException(status_code=401, detail="Missing bearer token")
 
-    token = authorization.split(" ", 1)[1]
-    if token != AUTH_TOKEN:
+    if not hmac.compare_digest(
+        authorization.encode("latin-1", "replace"), _EXPECTED_AUTH
+    ):
         raise HTTPException(status_code=401, detail="Invalid token")
 
 
 # -------------------- Embeddings --------------------
-def load_model() -> SentenceTransformer:
+def load_model():
     """
-    Lazy-load the embedding model (singleton).
+    Lazy-load the embedding model (singleton, double-checked lock).
+    Prefers the int8 ONNX backend on CPU; falls back to torch.
     """
     global _model
-    if _model is None:
+    if _model is not None:
+        return _model
+
+    with _model_lock:
+        if _model is not None:
+            return _model
+
+        from sentence_transformers import SentenceTransformer
+
         if DEBUG_LOG:
-            print(f"[INFO] Loading embedding model: {MEM_MODEL_NAME}")
-        _model = SentenceTransformer(MEM_MODEL_NAME)
+            print(f"[INFO] Loading embedding model: {MEM_MODEL_NAME} ({MEM_MODEL_BACKEND})")
+        model = None
+        if MEM_MODEL_BACKEND == "onnx":
+            try:
+                model = SentenceTransformer(
+                    MEM_MODEL_NAME,
+                    backend="onnx",
+                    model_kwargs={"file_name": "onnx/model_qint8_avx512_vnni.onnx"},
+                )
+            except Exception as e:
+                print(f"[WARN] ONNX backend unavailable ({e}); falling back to torch")
+        if model is None:
+            import torch
+
+            # Pin intra-op threads to half the cores and interop to 1 so
+            # encode doesn't oversubscribe the CPU alongside the server;
+            # pass the device explicitly instead of relying on the default.
+            torch.set_num_threads(max(1, (os.cpu_count() or 2) // 2))
+            try:
+                torch.set_num_interop_threads(1)
+            except RuntimeError:
+                pass  # settable only once, before any parallel work
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+            model = SentenceTransformer(MEM_MODEL_NAME, device=device)
+            if device == "cuda":
+                # Tensor-core fp16 matmuls; encode still returns float32
+                # numpy, so callers and stored blobs are unaffected.
+                model.half()
+            model.eval()
+        _model = model
     return _model
 
 
+# LRU cache of finished embeddings keyed by a 16-byte blake2b of the text.
+# Repeated queries ("what music do I like") skip the whole transformer
+# forward pass; ndarrays aren't hashable so a dict behind a lock is used
+# instead of functools.lru_cache.
+_EMBED_CACHE_MAX = 4096
+_embed_cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+_embed_cache_lock = threading.Lock()
+_embed_cache_stats = {"hits": 0, "misses": 0}
+
+
+def embed_cache_stats() -> dict:
+    """
+    Snapshot of embed-cache effectiveness (surfaced via /health).
+    """
+    with _embed_cache_lock:
+        return {
+            "size": len(_embed_cache),
+            "hits": _embed_cache_stats["hits"],
+            "misses": _embed_cache_stats["misses"],
+        }
+
+
 def embed(texts: List[str]) -> np.ndarray:
     """
-    Encode text into normalized float32 vectors.
+    Encode text into normalized float32 vectors (cached per text).
     """
-    model = load_model()
-    vecs = model.encode(texts, normalize_embeddings=True, convert_to_numpy=True)
-    return vecs.astype(np.float32, copy=False)
+    keys = [hashlib.blake2b(t.encode("utf-8"), digest_size=16).digest() for t in texts]
 
+    out: List[Optional[np.ndarray]] = [None] * len(texts)
+    missing: List[int] = []
+    with _embed_cache_lock:
+        for i, key in enumerate(keys):
+            vec = _embed_cache.get(key)
+            if vec is not None:
+                _embed_cache.move_to_end(key)
+                out[i] = vec
+            else:
+                missing.append(i)
+        _embed_cache_stats["hits"] += len(texts) - len(missing)
+        _embed_cache_stats["misses"] += len(missing)
 
-# -------------------- Time helpers --------------------
-def now_iso() -> str:
+    if missing:
+        model = load_model()
+        vecs = model.encode(
+            [texts[i] for i in missing],
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+        ).astype(np.float32, copy=False)
+        with _embed_cache_lock:
+            for j, i in enumerate(missing):
+                out[i] = vecs[j]
+                _embed_cache[keys[i]] = vecs[j]
+            while len(_embed_cache) > _EMBED_CACHE_MAX:
+                _embed_cache.popitem(last=False)
+
+    # np.stack copies, so callers can never mutate the cached rows
+    return np.stack(out)
+
+
+# Dedicated single-worker executor for the CPU-bound encode: serializes
+# model use (the encoder isn't re-entrant) without tying up FastAPI's
+# shared request threadpool or the event loop.
+_embed_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed")
+
+# Micro-batching: concurrent single-text requests landing within a short
+# window are coalesced into one encode call, amortizing tokenizer and
+# model-dispatch overhead across them. encode() itself sorts the batch by
+# length internally, so padding waste is already minimized.
+_EMBED_MAX_BATCH = 32
+_EMBED_MAX_WAIT = 0.003  # seconds
+_embed_queue: "Optional[asyncio.Queue]" = None
+
+
+async def _embed_batcher() -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await _embed_queue.get()]
+        deadline = loop.time() + _EMBED_MAX_WAIT
+        while len(batch) < _EMBED_MAX_BATCH:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(_embed_queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        try:
+            vecs = await loop.run_in_executor(_embed_pool, embed, [t for t, _ in batch])
+        except Exception as e:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            continue
+        for i, (_, fut) in enumerate(batch):
+            if not fut.done():
+                fut.set_result(vecs[i])
+
+
+async def embed_async(texts: List[str]) -> np.ndarray:
     """
-    Current UTC time in ISO-8601 string.
+    embed() off the event loop; single texts go through the coalescer.
     """
-    return datetime.now(timezone.utc).isoformat()
+    loop = asyncio.get_running_loop()
+    if len(texts) != 1:
+        return await loop.run_in_executor(_embed_pool, embed, texts)
+
+    global _embed_queue
+    if _embed_queue is None:
+        _embed_queue = asyncio.Queue()
+        loop.create_task(_embed_batcher())
 
+    fut = loop.create_future()
+    _embed_queue.put_nowait((texts[0], fut))
+    return np.stack([await fut])
 
-def iso_datetime(dt: datetime) -> str:
+
+# -------------------- Time helpers --------------------
+# now_iso is called on every /health; cache the formatted string at second
+# granularity so repeat calls within the same second are a list lookup
+# instead of datetime construction + isoformat. The string is written
+# before the second is published, so a concurrent reader never pairs the
+# new second with the previous second's string — at worst two threads
+# format the same second once each.
+_now_cache: List[Any] = [0, ""]
+
+
+def now_iso() -> str:
     """
-    Safe isoformat for a datetime.
+    Current UTC time in ISO-8601 string (second granularity, cached).
     """
-    try:
-        return dt.isoformat()
-    except Exception:
-        return datetime.utcnow().isoformat()
+    t = int(time.time())
+    if t != _now_cache[0]:
+        _now_cache[1] = datetime.fromtimestamp(t, timezone.utc).isoformat()
+        _now_cache[0] = t
+    return _now_cache[1]
 
 
 def parse_ts(s: Optional[str]) -> datetime:
@@ -83,7 +257,11 @@ def parse_ts(s: Optional[str]) -> datetime:
     if not s:
         return datetime.now(timezone.utc)
     try:
-        dt = datetime.fromisoformat(s.replace("Z", "+00:00"))
+        if parse_datetime is not None:
+            # ciso8601 handles the 'Z' suffix natively
+            dt = parse_datetime(s)
+        else:
+            dt = datetime.fromisoformat(s.replace("Z", "+00:00"))
         if dt.tzinfo is None:
             # 没有时区信息时，显式标记为 UTC
             dt = dt.replace(tzinfo=timezone.utc)